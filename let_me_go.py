@@ -10,12 +10,31 @@ from tkinter import messagebox
 import threading
 import time
 import datetime
-import json
+import bisect
+from functools import lru_cache
 import os
 import sys
 import winreg
 import pystray
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
+
+# 优先使用 orjson（C 实现，解析更快），未安装时回退到标准库 json
+try:
+    import orjson
+    
+    def _json_loads(data):
+        return orjson.loads(data)
+    
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    import json
+    
+    def _json_loads(data):
+        return json.loads(data)
+    
+    def _json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, indent=4).encode("utf-8")
 
 
 # =============== 常量定义 ===============
@@ -33,6 +52,12 @@ CONFIG_FILE = os.path.join(APP_DIR, "config.json")
 APP_NAME = "LetMeGo"
 REGISTRY_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
 
+# 托盘倒计时字体，启动时加载一次
+try:
+    _TRAY_FONT = ImageFont.truetype("C:/Windows/Fonts/arial.ttf", 12)
+except Exception:
+    _TRAY_FONT = ImageFont.load_default()
+
 
 # =============== 配置管理 ===============
 class ConfigManager:
@@ -53,48 +78,78 @@ class ConfigManager:
             "off_work_time": "18:00",  # 下班时间
             "off_work_reminder_enabled": True  # 是否启用下班提醒
         }
+        # 已解析配置的缓存，以文件的 (mtime, size) 作为失效依据
+        self._cache = None
+        self._cache_key = None
+    
+    def _normalize(self, config):
+        """兼容旧版本配置格式并补全缺失的默认值"""
+        # 兼容旧版本配置格式
+        if "start_time" in config and "work_periods" not in config:
+            # 旧格式，转换为新格式
+            config = {
+                "work_periods": [
+                    {"start": config.get("start_time", "09:00"), 
+                     "end": config.get("end_time", "18:00")}
+                ],
+                "block_periods": [
+                    {"start": config.get("block_start", "12:00"), 
+                     "end": config.get("block_end", "13:30")}
+                ],
+                "interval_minutes": config.get("interval_minutes", 60),
+                "auto_start": config.get("auto_start", False)
+            }
+        # 合并默认配置，确保所有键都存在
+        for key in self.default_config:
+            if key not in config:
+                config[key] = self.default_config[key]
+        # 确保列表不为空
+        if not config.get("work_periods"):
+            config["work_periods"] = self.default_config["work_periods"]
+        if not config.get("block_periods"):
+            config["block_periods"] = self.default_config["block_periods"]
+        return config
+    
+    def load_or_none(self):
+        """加载配置文件，返回 (配置, 文件是否存在)；文件不存在时配置为 None
+        
+        文件未变化时直接返回缓存的配置。
+        """
+        try:
+            st = os.stat(self.config_file)
+            cache_key = (st.st_mtime_ns, st.st_size)
+            if cache_key == self._cache_key:
+                return self._cache, True
+            with open(self.config_file, "rb") as f:
+                config = self._normalize(_json_loads(f.read()))
+            self._cache = config
+            self._cache_key = cache_key
+            return config, True
+        except FileNotFoundError:
+            self._cache = None
+            self._cache_key = None
+            return None, False
+        except Exception as e:
+            print(f"加载配置文件失败: {e}")
+            return self.default_config.copy(), True
     
     def load_config(self):
-        """加载配置文件"""
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    config = json.load(f)
-                    # 兼容旧版本配置格式
-                    if "start_time" in config and "work_periods" not in config:
-                        # 旧格式，转换为新格式
-                        config = {
-                            "work_periods": [
-                                {"start": config.get("start_time", "09:00"), 
-                                 "end": config.get("end_time", "18:00")}
-                            ],
-                            "block_periods": [
-                                {"start": config.get("block_start", "12:00"), 
-                                 "end": config.get("block_end", "13:30")}
-                            ],
-                            "interval_minutes": config.get("interval_minutes", 60),
-                            "auto_start": config.get("auto_start", False)
-                        }
-                    # 合并默认配置，确保所有键都存在
-                    for key in self.default_config:
-                        if key not in config:
-                            config[key] = self.default_config[key]
-                    # 确保列表不为空
-                    if not config.get("work_periods"):
-                        config["work_periods"] = self.default_config["work_periods"]
-                    if not config.get("block_periods"):
-                        config["block_periods"] = self.default_config["block_periods"]
-                    return config
-            except Exception as e:
-                print(f"加载配置文件失败: {e}")
-                return self.default_config.copy()
-        return self.default_config.copy()
+        """加载配置文件，文件不存在时返回默认配置"""
+        config, _ = self.load_or_none()
+        if config is None:
+            return self.default_config.copy()
+        return config
     
     def save_config(self, config):
         """保存配置文件"""
         try:
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            with open(self.config_file, "wb") as f:
+                f.write(_json_dumps(config))
+            # 直接用写入的内容更新缓存，保存后重新加载时无需再读取和解析文件
+            # （文件时间戳精度有限，如FAT32为2秒，不能依赖修改时间判断文件已变化）
+            st = os.stat(self.config_file)
+            self._cache = self._normalize(dict(config))
+            self._cache_key = (st.st_mtime_ns, st.st_size)
             return True
         except Exception as e:
             print(f"保存配置文件失败: {e}")
@@ -119,34 +174,45 @@ class AutoStartManager:
     def is_auto_start_enabled():
         """检查是否已设置开机自启动"""
         try:
-            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, REGISTRY_KEY)
-            try:
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, REGISTRY_KEY, 0, winreg.KEY_READ) as key:
                 value, _ = winreg.QueryValueEx(key, APP_NAME)
                 return value == AutoStartManager.get_exe_path()
-            except FileNotFoundError:
-                return False
-            finally:
-                winreg.CloseKey(key)
+        except FileNotFoundError:
+            return False
         except Exception as e:
             print(f"检查自启动状态失败: {e}")
             return False
     
+    @staticmethod
+    def _write_values(values):
+        """在同一个注册表句柄下批量写入值，values 为 {名称: (类型, 值)}"""
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, REGISTRY_KEY, 0, winreg.KEY_SET_VALUE) as key:
+            for name, (value_type, value) in values.items():
+                winreg.SetValueEx(key, name, 0, value_type, value)
+    
+    @staticmethod
+    def _delete_values(names):
+        """在同一个注册表句柄下批量删除值，返回实际删除的名称（不存在的值会被忽略）"""
+        deleted = []
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, REGISTRY_KEY, 0, winreg.KEY_SET_VALUE) as key:
+            for name in names:
+                try:
+                    winreg.DeleteValue(key, name)
+                    deleted.append(name)
+                except FileNotFoundError:
+                    pass
+        return deleted
+    
     @staticmethod
     def set_auto_start(enabled):
         """设置或取消开机自启动"""
         try:
-            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, REGISTRY_KEY, 0, winreg.KEY_SET_VALUE)
             if enabled:
                 exe_path = AutoStartManager.get_exe_path()
-                winreg.SetValueEx(key, APP_NAME, 0, winreg.REG_SZ, exe_path)
+                AutoStartManager._write_values({APP_NAME: (winreg.REG_SZ, exe_path)})
                 print(f"已设置开机自启动: {exe_path}")
-            else:
-                try:
-                    winreg.DeleteValue(key, APP_NAME)
-                    print("已取消开机自启动")
-                except FileNotFoundError:
-                    pass
-            winreg.CloseKey(key)
+            elif AutoStartManager._delete_values([APP_NAME]):
+                print("已取消开机自启动")
             return True
         except Exception as e:
             print(f"设置自启动失败: {e}")
@@ -157,20 +223,81 @@ class AutoStartManager:
 # =============== 工具函数 ===============
 def parse_time(time_str):
     """解析时间字符串为datetime.time对象"""
+    if not isinstance(time_str, str):
+        return None
+    return _parse_time_cached(time_str.strip())
+
+
+@lru_cache(maxsize=256)
+def _parse_time_cached(time_str):
+    """parse_time 的缓存实现（datetime.time 不可变，结果可安全共享）"""
     try:
         hour, minute = map(int, time_str.split(":"))
         return datetime.time(hour, minute)
-    except (ValueError, AttributeError):
+    except ValueError:
         return None
 
 
-def time_in_range(start_time, end_time, current_time):
-    """判断当前时间是否在指定时间范围内"""
-    if start_time <= end_time:
-        return start_time <= current_time <= end_time
-    else:
-        # 跨天的情况
-        return current_time >= start_time or current_time <= end_time
+def parse_periods(periods):
+    """将时间段配置解析为按开始时间排序的 (开始, 结束) datetime.time 列表，忽略格式错误的项"""
+    ranges = []
+    for period in periods:
+        start_time = parse_time(period.get("start"))
+        end_time = parse_time(period.get("end"))
+        if start_time and end_time:
+            ranges.append((start_time, end_time))
+    ranges.sort()
+    return ranges
+
+
+def build_minute_index(ranges):
+    """将时间段转换为按开始分钟排序、互不重叠的 (starts, ends) 整数列表
+    
+    每一段为左闭右开区间 [start, end)，即结束时间那一分钟已不在时间段内；
+    跨天的时间段拆分为 [start, 1440) 和 [0, end) 两段；重叠或首尾相接的时间段
+    合并为一段，这样二分查找定位到的唯一候选区间即可判断当前分钟是否被覆盖。
+    """
+    intervals = []
+    for start_time, end_time in ranges:
+        start_min = start_time.hour * 60 + start_time.minute
+        end_min = end_time.hour * 60 + end_time.minute
+        if start_min <= end_min:
+            intervals.append((start_min, end_min))
+        else:
+            # 跨天的情况
+            intervals.append((start_min, 24 * 60))
+            intervals.append((0, end_min))
+    intervals.sort()
+    
+    starts = []
+    ends = []
+    for start_min, end_min in intervals:
+        if start_min == end_min:
+            # 空区间（开始等于结束）不覆盖任何分钟
+            continue
+        if ends and start_min <= ends[-1]:
+            ends[-1] = max(ends[-1], end_min)
+        else:
+            starts.append(start_min)
+            ends.append(end_min)
+    return starts, ends
+
+
+def minute_in_index(starts, ends, minute):
+    """判断某一分钟是否落在 build_minute_index 生成的任意时间段 [start, end) 内"""
+    idx = bisect.bisect_right(starts, minute) - 1
+    return idx >= 0 and minute < ends[idx]
+
+
+def days_until_next_workday(workday_mask, weekday):
+    """计算从 weekday（1=周一, 7=周日）之后到下一个工作日的天数（1-7），没有工作日时返回 0
+    
+    workday_mask 的第 d-1 位表示星期 d 是否为工作日。把掩码循环右移到明天对应的位置，
+    最低位的 1 即下一个工作日。
+    """
+    shift = weekday % 7
+    rotated = ((workday_mask >> shift) | (workday_mask << (7 - shift))) & 0x7F
+    return (rotated & -rotated).bit_length()
 
 
 # =============== 主应用类 ===============
@@ -179,46 +306,86 @@ class LetMeGoApp:
     
     def __init__(self):
         self.config_manager = ConfigManager()
-        self.config = self.config_manager.load_config()
+        config, config_exists = self.config_manager.load_or_none()
+        self.config = config if config is not None else self.config_manager.default_config.copy()
         self.running = False
         self.next_reminder = None
         self.icon = None
         self.tray_running = True
-        self.last_reminder_time = None
+        self.last_reminder_mono = None  # 上次提醒的 time.monotonic() 时间，不受系统时间调整影响
         self.last_off_work_reminder_date = None  # 记录今天是否已发送下班提醒
-        self.is_first_start = True  # 标记是否首次启动
+        self._boundaries_date = None  # 当天时间边界缓存对应的日期
+        self._today_bounds = []  # 当天各时间边界对应的datetime
+        self._day_events = []  # 当天（工作日）的工作时间段开始和屏蔽结束时间，已排序
+        self._next_workday_start = None  # 下一个工作日最早的工作开始时间
+        self._off_work_reminder_dt = None  # 当天（工作日）的下班提醒时间（下班前10分钟）
+        self._tick_fn = self._first_tick  # 工作时间段内的检查函数，首次检查后切换为常规检查
+        # 自启动状态只会被本程序修改，读取一次后缓存
+        self._autostart_cached = AutoStartManager.is_auto_start_enabled()
+        self._config_dirty = threading.Event()  # 配置已变更，提醒服务需重新加载
+        self._config_dirty.set()
+        self._wake = threading.Event()  # 唤醒提醒服务重新计算下一次事件
+        self._icon_cache = {}  # 托盘图标缓存，键为倒计时文字
+        self._last_icon_key = None  # 托盘上最近一次显示的倒计时状态
+        self._base_clock_img = self._build_clock_face()  # 静态表盘，只绘制一次
+        self._config_window = None  # 配置窗口，首次显示时创建，关闭后隐藏以便复用
+        # 托盘菜单回调，只绑定一次
+        self._cb_show = self.on_tray_show_config
+        self._cb_remind = self.on_tray_manual_reminder
+        self._cb_exit = self.on_tray_exit
+        
+        # 整个程序共用一个隐藏的Tk根窗口，由主线程运行其事件循环
+        self._tk_root = tk.Tk()
+        self._tk_root.withdraw()
+        # 提醒弹窗以根窗口为父窗口，保持置顶
+        self._tk_root.attributes('-topmost', True)
         
         # 判断是否应该显示配置窗口
-        should_show = self.should_show_config()
+        should_show = self.should_show_config(config_exists)
         
         # 如果不需要显示配置窗口且配置了自动启动，直接启动托盘
         if not should_show and self.config.get("auto_start", False):
             self.start_reminder_service()
         else:
             self.show_config_window()
+        
+        # 运行到托盘退出（或首次配置时关闭配置窗口）为止
+        self._tk_root.mainloop()
+        self.running = False
+        self._tk_root.destroy()
     
-    def should_show_config(self):
+    def should_show_config(self, config_exists):
         """判断是否应该显示配置窗口（首次运行或参数中指定）"""
         # 如果命令行参数包含 --config 或 --setup，显示配置窗口
         if "--config" in sys.argv or "--setup" in sys.argv:
             return True
         
         # 如果配置文件不存在，显示配置窗口（首次运行）
-        if not os.path.exists(CONFIG_FILE):
+        if not config_exists:
             return True
         
         return False
     
     def show_config_window(self):
-        """显示配置窗口"""
-        # 重新加载配置以确保显示最新值
-        self.config = self.config_manager.load_config()
-        
-        root = tk.Tk()
+        """显示配置窗口（须在Tk线程中调用；窗口只创建一次，之后复用）"""
+        if self._config_window is None:
+            self._build_config_window()
+            self._populate_from_config()
+        elif self._config_window.state() == "withdrawn":
+            self._populate_from_config()
+        # 窗口已经打开（如重复点击托盘菜单）时只需置前，保留用户尚未保存的修改
+        self._config_window.deiconify()
+        self._config_window.lift()
+    
+    def _build_config_window(self):
+        """创建配置窗口及其中的所有控件"""
+        root = tk.Toplevel(self._tk_root)
         root.title("Let Me Go - 健康提醒设置")
         root.geometry("700x650")
         root.resizable(True, True)
         root.minsize(600, 550)
+        root.protocol("WM_DELETE_WINDOW", self._on_config_close)
+        self._config_window = root
         
         # 居中显示窗口
         root.update_idletasks()
@@ -239,34 +406,25 @@ class LetMeGoApp:
         canvas = tk.Canvas(main_container, bg="#F5F5F5", highlightthickness=0)
         scrollbar = tk.Scrollbar(main_container, orient="vertical", command=canvas.yview)
         scrollable_frame = tk.Frame(canvas, bg="#F5F5F5")
+        scrollable_frame.grid_columnconfigure(0, weight=1)
         
         scrollable_frame.bind(
             "<Configure>",
             lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
         )
         
-        # 使用居中布局
-        def on_canvas_configure(event):
-            canvas_width = event.width
-            scrollable_frame.update_idletasks()
-            frame_width = scrollable_frame.winfo_width()
-            if frame_width > 0:
-                x = (canvas_width - frame_width) // 2
-                canvas.coords(canvas.find_all()[0], x, 0)
-            canvas.configure(scrollregion=canvas.bbox("all"))
-        
-        canvas.bind('<Configure>', on_canvas_configure)
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+        # 内容宽度始终跟随画布宽度
+        window_id = canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+        canvas.bind('<Configure>', lambda e: canvas.itemconfigure(window_id, width=e.width))
         canvas.configure(yscrollcommand=scrollbar.set)
         
-        # 内容容器（限制最大宽度，居中显示）
-        content_frame = tk.Frame(scrollable_frame, bg="#F5F5F5", width=600)
-        content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        # 内容容器（横向填满画布）
+        content_frame = tk.Frame(scrollable_frame, bg="#F5F5F5")
+        content_frame.grid(row=0, column=0, sticky="ew", padx=20, pady=20)
         
         # 标题区域（微信风格的顶部区域）
-        header_frame = tk.Frame(content_frame, bg="#FFFFFF", relief=tk.FLAT, height=80)
+        header_frame = tk.Frame(content_frame, bg="#FFFFFF", relief=tk.FLAT)
         header_frame.pack(fill=tk.X, pady=(0, 15))
-        header_frame.pack_propagate(False)
         
         title_label = tk.Label(header_frame, text="⏰ 健康提醒设置", 
                                font=("微软雅黑", 18, "bold"), bg="#FFFFFF", fg="#1A1A1A")
@@ -281,62 +439,14 @@ class LetMeGoApp:
         tk.Label(work_frame, text="提醒生效的时间段", font=("微软雅黑", 10), 
                 bg="#FFFFFF", fg="#888888", anchor="w").pack(fill=tk.X, pady=(0, 15))
         
-        work_periods_widgets = []
-        
-        def add_work_period(period=None):
-            """添加一个工作时间段"""
-            item_frame = tk.Frame(work_frame)
-            item_frame.pack(fill=tk.X, pady=5)
-            
-            tk.Label(item_frame, text="开始:", width=6, anchor="w").pack(side=tk.LEFT, padx=5)
-            start_entry = tk.Entry(item_frame, font=("Consolas", 11), width=10)
-            start_entry.pack(side=tk.LEFT, padx=5)
-            
-            tk.Label(item_frame, text="结束:", width=6, anchor="w").pack(side=tk.LEFT, padx=5)
-            end_entry = tk.Entry(item_frame, font=("Consolas", 11), width=10)
-            end_entry.pack(side=tk.LEFT, padx=5)
-            
-            if period:
-                start_entry.insert(0, period.get("start", "09:00"))
-                end_entry.insert(0, period.get("end", "18:00"))
-            else:
-                start_entry.insert(0, "09:00")
-                end_entry.insert(0, "18:00")
-            
-            def remove_work():
-                item_frame.destroy()
-                if (start_entry, end_entry, item_frame) in work_periods_widgets:
-                    work_periods_widgets.remove((start_entry, end_entry, item_frame))
-                root.update_idletasks()
-                on_canvas_configure(None)
-            
-            remove_btn = tk.Button(item_frame, text="删除", command=remove_work, 
-                                   font=("微软雅黑", 9), width=8, bg="#FF4444", fg="white",
-                                   relief=tk.FLAT, cursor="hand2")
-            remove_btn.pack(side=tk.RIGHT, padx=5)
-            
-            work_periods_widgets.append((start_entry, end_entry, item_frame))
-        
-        def add_work_btn_click():
-            add_work_period()
-            root.update_idletasks()
-            on_canvas_configure(None)
-        
-        # 加载已有的工作时间段
-        work_periods = self.config.get("work_periods", [])
-        if not work_periods and "start_time" in self.config:
-            # 兼容旧格式
-            work_periods = [{"start": self.config.get("start_time", "09:00"), 
-                           "end": self.config.get("end_time", "18:00")}]
-        
-        for period in work_periods:
-            add_work_period(period)
-        
-        # 如果没有时间段，添加一个默认的
-        if not work_periods_widgets:
-            add_work_period()
+        # 时间段列表放在单独的容器中，重新填充时仍位于“添加”按钮之上
+        self._work_list_frame = tk.Frame(work_frame, bg="#FFFFFF")
+        self._work_list_frame.pack(fill=tk.X)
+        self._work_periods_widgets = []
         
-        add_work_btn = tk.Button(work_frame, text="+ 添加时间段", command=add_work_btn_click,
+        add_work_btn = tk.Button(work_frame, text="+ 添加时间段",
+                                command=lambda: self._add_period_row(
+                                    self._work_list_frame, self._work_periods_widgets, "09:00", "18:00"),
                                 font=("微软雅黑", 10), bg="#07C160", fg="white",
                                 relief=tk.FLAT, padx=15, pady=5, cursor="hand2")
         add_work_btn.pack(pady=(5, 0))
@@ -350,58 +460,13 @@ class LetMeGoApp:
         tk.Label(block_frame, text="不提醒的时间段", font=("微软雅黑", 10), 
                 bg="#FFFFFF", fg="#888888", anchor="w").pack(fill=tk.X, pady=(0, 15))
         
-        block_periods_widgets = []
+        self._block_list_frame = tk.Frame(block_frame, bg="#FFFFFF")
+        self._block_list_frame.pack(fill=tk.X)
+        self._block_periods_widgets = []
         
-        def add_block_period(period=None):
-            """添加一个屏蔽时间段"""
-            item_frame = tk.Frame(block_frame)
-            item_frame.pack(fill=tk.X, pady=5)
-            
-            tk.Label(item_frame, text="开始:", width=6, anchor="w").pack(side=tk.LEFT, padx=5)
-            start_entry = tk.Entry(item_frame, font=("Consolas", 11), width=10)
-            start_entry.pack(side=tk.LEFT, padx=5)
-            
-            tk.Label(item_frame, text="结束:", width=6, anchor="w").pack(side=tk.LEFT, padx=5)
-            end_entry = tk.Entry(item_frame, font=("Consolas", 11), width=10)
-            end_entry.pack(side=tk.LEFT, padx=5)
-            
-            if period:
-                start_entry.insert(0, period.get("start", "12:00"))
-                end_entry.insert(0, period.get("end", "13:30"))
-            else:
-                start_entry.insert(0, "12:00")
-                end_entry.insert(0, "13:30")
-            
-            def remove_block():
-                item_frame.destroy()
-                if (start_entry, end_entry, item_frame) in block_periods_widgets:
-                    block_periods_widgets.remove((start_entry, end_entry, item_frame))
-                root.update_idletasks()
-                on_canvas_configure(None)
-            
-            remove_btn = tk.Button(item_frame, text="删除", command=remove_block,
-                                  font=("微软雅黑", 9), width=8, bg="#FF4444", fg="white",
-                                  relief=tk.FLAT, cursor="hand2")
-            remove_btn.pack(side=tk.RIGHT, padx=5)
-            
-            block_periods_widgets.append((start_entry, end_entry, item_frame))
-        
-        def add_block_btn_click():
-            add_block_period()
-            root.update_idletasks()
-            on_canvas_configure(None)
-        
-        # 加载已有的屏蔽时间段
-        block_periods = self.config.get("block_periods", [])
-        if not block_periods and "block_start" in self.config:
-            # 兼容旧格式
-            block_periods = [{"start": self.config.get("block_start", "12:00"), 
-                            "end": self.config.get("block_end", "13:30")}]
-        
-        for period in block_periods:
-            add_block_period(period)
-        
-        add_block_btn = tk.Button(block_frame, text="+ 添加时间段", command=add_block_btn_click,
+        add_block_btn = tk.Button(block_frame, text="+ 添加时间段",
+                                  command=lambda: self._add_period_row(
+                                      self._block_list_frame, self._block_periods_widgets, "12:00", "13:30"),
                                   font=("微软雅黑", 10), bg="#FF9500", fg="white",
                                   relief=tk.FLAT, padx=15, pady=5, cursor="hand2")
         add_block_btn.pack(pady=(5, 0))
@@ -416,10 +481,9 @@ class LetMeGoApp:
         interval_entry_frame.pack(fill=tk.X)
         tk.Label(interval_entry_frame, text="分钟", font=("微软雅黑", 11), 
                 bg="#FFFFFF", fg="#1A1A1A").pack(side=tk.LEFT, padx=(0, 10))
-        interval_entry = tk.Entry(interval_entry_frame, font=("Consolas", 12), width=10,
-                                  relief=tk.SOLID, borderwidth=1)
-        interval_entry.insert(0, str(self.config.get("interval_minutes", 60)))
-        interval_entry.pack(side=tk.LEFT)
+        self._interval_entry = tk.Entry(interval_entry_frame, font=("Consolas", 12), width=10,
+                                        relief=tk.SOLID, borderwidth=1)
+        self._interval_entry.pack(side=tk.LEFT)
         
         # 工作日设置（微信风格白色卡片）
         workdays_frame = tk.Frame(content_frame, bg="#FFFFFF", relief=tk.FLAT, padx=20, pady=15)
@@ -429,16 +493,14 @@ class LetMeGoApp:
                 bg="#FFFFFF", fg="#1A1A1A", anchor="w").pack(fill=tk.X, pady=(0, 15))
         
         workdays_labels = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
-        workdays_vars = []
-        workdays_config = self.config.get("workdays", [1, 2, 3, 4, 5])
+        self._workdays_vars = []
         
         workdays_check_frame = tk.Frame(workdays_frame)
         workdays_check_frame.pack(anchor="w")
         
         for i in range(7):
-            day_num = i + 1  # 1=周一, 7=周日
-            var = tk.BooleanVar(value=day_num in workdays_config)
-            workdays_vars.append(var)
+            var = tk.BooleanVar(root)  # 索引 i 对应 i + 1 (1=周一, 7=周日)
+            self._workdays_vars.append(var)
             check = tk.Checkbutton(workdays_check_frame, text=workdays_labels[i], 
                                   variable=var, font=("微软雅黑", 10))
             check.pack(side=tk.LEFT, padx=10)
@@ -455,20 +517,18 @@ class LetMeGoApp:
         off_work_time_frame.pack(fill=tk.X, pady=5)
         tk.Label(off_work_time_frame, text="下班时间", font=("微软雅黑", 11), 
                 bg="#FFFFFF", fg="#1A1A1A").pack(side=tk.LEFT, padx=(0, 10))
-        off_work_time_entry = tk.Entry(off_work_time_frame, font=("Consolas", 11), width=10,
-                                       relief=tk.SOLID, borderwidth=1)
-        off_work_time_entry.insert(0, self.config.get("off_work_time", "18:00"))
-        off_work_time_entry.pack(side=tk.LEFT, padx=(0, 10))
+        self._off_work_time_entry = tk.Entry(off_work_time_frame, font=("Consolas", 11), width=10,
+                                             relief=tk.SOLID, borderwidth=1)
+        self._off_work_time_entry.pack(side=tk.LEFT, padx=(0, 10))
         tk.Label(off_work_time_frame, text="(距离下班10分钟时提醒)", 
                 font=("微软雅黑", 9), bg="#FFFFFF", fg="#888888").pack(side=tk.LEFT)
         
         # 下班提醒开关
-        off_work_reminder_enabled = self.config.get("off_work_reminder_enabled", True)
-        off_work_reminder_var = tk.BooleanVar(value=off_work_reminder_enabled)
+        self._off_work_reminder_var = tk.BooleanVar(root)
         off_work_reminder_check = tk.Checkbutton(
             off_work_frame, 
             text="启用下班提醒", 
-            variable=off_work_reminder_var,
+            variable=self._off_work_reminder_var,
             font=("微软雅黑", 10)
         )
         off_work_reminder_check.pack(anchor="w", pady=5)
@@ -477,12 +537,11 @@ class LetMeGoApp:
         auto_start_frame = tk.Frame(content_frame, bg="#FFFFFF", relief=tk.FLAT, padx=20, pady=15)
         auto_start_frame.pack(fill=tk.X, pady=(0, 20))
         
-        auto_start_value = self.config.get("auto_start", AutoStartManager.is_auto_start_enabled())
-        auto_start_var = tk.BooleanVar(value=auto_start_value)
+        self._auto_start_var = tk.BooleanVar(root)
         auto_start_check = tk.Checkbutton(
             auto_start_frame, 
             text="开机自动启动", 
-            variable=auto_start_var,
+            variable=self._auto_start_var,
             font=("微软雅黑", 12),
             bg="#FFFFFF",
             fg="#1A1A1A",
@@ -492,91 +551,6 @@ class LetMeGoApp:
         )
         auto_start_check.pack(anchor="w")
         
-        def validate_and_start():
-            """验证并启动"""
-            try:
-                # 验证工作时间段
-                work_periods = []
-                for start_entry, end_entry, _ in work_periods_widgets:
-                    start_time = start_entry.get().strip()
-                    end_time = end_entry.get().strip()
-                    if not start_time or not end_time:
-                        continue
-                    if not parse_time(start_time) or not parse_time(end_time):
-                        messagebox.showerror("错误", f"工作时间段格式错误: {start_time} - {end_time}\n请使用 HH:MM 格式（如 09:00）")
-                        return
-                    work_periods.append({"start": start_time, "end": end_time})
-                
-                if not work_periods:
-                    messagebox.showerror("错误", "至少需要配置一个工作时间段！")
-                    return
-                
-                # 验证屏蔽时间段
-                block_periods = []
-                for start_entry, end_entry, _ in block_periods_widgets:
-                    start_time = start_entry.get().strip()
-                    end_time = end_entry.get().strip()
-                    if not start_time or not end_time:
-                        continue
-                    if not parse_time(start_time) or not parse_time(end_time):
-                        messagebox.showerror("错误", f"屏蔽时间段格式错误: {start_time} - {end_time}\n请使用 HH:MM 格式（如 09:00）")
-                        return
-                    block_periods.append({"start": start_time, "end": end_time})
-                
-                # 验证间隔
-                try:
-                    interval = int(interval_entry.get().strip())
-                    if interval <= 0:
-                        raise ValueError
-                except ValueError:
-                    messagebox.showerror("错误", "提醒间隔必须是大于0的整数")
-                    return
-                
-                # 获取工作日设置
-                selected_workdays = []
-                for i, var in enumerate(workdays_vars):
-                    if var.get():
-                        selected_workdays.append(i + 1)  # 1=周一, 7=周日
-                
-                if not selected_workdays:
-                    messagebox.showerror("错误", "至少需要选择一个工作日！")
-                    return
-                
-                # 验证下班时间
-                off_work_time = off_work_time_entry.get().strip()
-                if off_work_time and not parse_time(off_work_time):
-                    messagebox.showerror("错误", f"下班时间格式错误: {off_work_time}\n请使用 HH:MM 格式（如 18:00）")
-                    return
-                
-                # 保存配置
-                self.config = {
-                    "work_periods": work_periods,
-                    "block_periods": block_periods,
-                    "interval_minutes": interval,
-                    "auto_start": auto_start_var.get(),
-                    "workdays": selected_workdays,
-                    "off_work_time": off_work_time if off_work_time else "18:00",
-                    "off_work_reminder_enabled": off_work_reminder_var.get()
-                }
-                self.config_manager.save_config(self.config)
-                
-                # 设置开机自启动
-                AutoStartManager.set_auto_start(auto_start_var.get())
-                
-                # 关闭配置窗口
-                root.destroy()
-
-                # 如果服务未运行，启动服务；如果已运行，配置会在下次循环时生效
-                if not self.running:
-                    self.start_reminder_service()
-                else:
-                    # 服务已在运行，重置提醒时间以立即应用新配置
-                    self.last_reminder_time = None
-                    messagebox.showinfo("提示", "配置已保存，新的设置将在下次提醒时生效！")
-                
-            except Exception as e:
-                messagebox.showerror("错误", f"启动失败: {e}")
-        
         # 启动按钮（微信风格绿色按钮）
         button_frame = tk.Frame(content_frame, bg="#F5F5F5")
         button_frame.pack(fill=tk.X, pady=(0, 20))
@@ -584,7 +558,7 @@ class LetMeGoApp:
         start_button = tk.Button(
             button_frame, 
             text="保存并启动", 
-            command=validate_and_start,
+            command=self._on_config_save,
             bg="#07C160",
             fg="white",
             font=("微软雅黑", 14, "bold"),
@@ -618,14 +592,178 @@ class LetMeGoApp:
             canvas.yview_scroll(int(-1*(event.delta/120)), "units")
         
         canvas.bind_all("<MouseWheel>", on_mousewheel)
+    
+    def _populate_from_config(self):
+        """用当前配置刷新配置窗口中的各输入项"""
+        for widgets in (self._work_periods_widgets, self._block_periods_widgets):
+            for _, _, item_frame in widgets:
+                item_frame.destroy()
+            widgets.clear()
         
-        root.update_idletasks()
-        canvas.configure(scrollregion=canvas.bbox("all"))
+        # 加载已有的工作时间段
+        work_periods = self.config.get("work_periods", [])
+        if not work_periods and "start_time" in self.config:
+            # 兼容旧格式
+            work_periods = [{"start": self.config.get("start_time", "09:00"), 
+                           "end": self.config.get("end_time", "18:00")}]
+        
+        for period in work_periods:
+            self._add_period_row(self._work_list_frame, self._work_periods_widgets,
+                                 period.get("start", "09:00"), period.get("end", "18:00"))
         
-        root.mainloop()
+        # 如果没有时间段，添加一个默认的
+        if not self._work_periods_widgets:
+            self._add_period_row(self._work_list_frame, self._work_periods_widgets, "09:00", "18:00")
+        
+        # 加载已有的屏蔽时间段
+        block_periods = self.config.get("block_periods", [])
+        if not block_periods and "block_start" in self.config:
+            # 兼容旧格式
+            block_periods = [{"start": self.config.get("block_start", "12:00"), 
+                            "end": self.config.get("block_end", "13:30")}]
+        
+        for period in block_periods:
+            self._add_period_row(self._block_list_frame, self._block_periods_widgets,
+                                 period.get("start", "12:00"), period.get("end", "13:30"))
+        
+        self._interval_entry.delete(0, tk.END)
+        self._interval_entry.insert(0, str(self.config.get("interval_minutes", 60)))
+        
+        workdays_config = self.config.get("workdays", [1, 2, 3, 4, 5])
+        for i, var in enumerate(self._workdays_vars):
+            var.set(i + 1 in workdays_config)
+        
+        self._off_work_time_entry.delete(0, tk.END)
+        self._off_work_time_entry.insert(0, self.config.get("off_work_time", "18:00"))
+        self._off_work_reminder_var.set(self.config.get("off_work_reminder_enabled", True))
+        self._auto_start_var.set(self.config.get("auto_start", self._autostart_cached))
     
-    def create_tray_icon_image(self, text=""):
-        """创建托盘图标图像（闹钟图标）"""
+    def _add_period_row(self, container, widgets, start, end):
+        """在配置窗口中添加一行时间段输入"""
+        item_frame = tk.Frame(container)
+        item_frame.pack(fill=tk.X, pady=5)
+        
+        tk.Label(item_frame, text="开始:", width=6, anchor="w").pack(side=tk.LEFT, padx=5)
+        start_entry = tk.Entry(item_frame, font=("Consolas", 11), width=10)
+        start_entry.pack(side=tk.LEFT, padx=5)
+        
+        tk.Label(item_frame, text="结束:", width=6, anchor="w").pack(side=tk.LEFT, padx=5)
+        end_entry = tk.Entry(item_frame, font=("Consolas", 11), width=10)
+        end_entry.pack(side=tk.LEFT, padx=5)
+        
+        start_entry.insert(0, start)
+        end_entry.insert(0, end)
+        row = (start_entry, end_entry, item_frame)
+        
+        def remove_row():
+            item_frame.destroy()
+            if row in widgets:
+                widgets.remove(row)
+        
+        remove_btn = tk.Button(item_frame, text="删除", command=remove_row,
+                               font=("微软雅黑", 9), width=8, bg="#FF4444", fg="white",
+                               relief=tk.FLAT, cursor="hand2")
+        remove_btn.pack(side=tk.RIGHT, padx=5)
+        
+        widgets.append(row)
+    
+    def _on_config_close(self):
+        """关闭配置窗口：服务运行时仅隐藏以便复用，首次配置时直接退出程序"""
+        if self.running:
+            self._config_window.withdraw()
+        else:
+            self._tk_root.quit()
+    
+    def _on_config_save(self):
+        """验证并启动"""
+        window = self._config_window
+        try:
+            # 验证工作时间段
+            work_periods = []
+            for start_entry, end_entry, _ in self._work_periods_widgets:
+                start_time = start_entry.get().strip()
+                end_time = end_entry.get().strip()
+                if not start_time or not end_time:
+                    continue
+                if not parse_time(start_time) or not parse_time(end_time):
+                    messagebox.showerror("错误", f"工作时间段格式错误: {start_time} - {end_time}\n请使用 HH:MM 格式（如 09:00）", parent=window)
+                    return
+                work_periods.append({"start": start_time, "end": end_time})
+            
+            if not work_periods:
+                messagebox.showerror("错误", "至少需要配置一个工作时间段！", parent=window)
+                return
+            
+            # 验证屏蔽时间段
+            block_periods = []
+            for start_entry, end_entry, _ in self._block_periods_widgets:
+                start_time = start_entry.get().strip()
+                end_time = end_entry.get().strip()
+                if not start_time or not end_time:
+                    continue
+                if not parse_time(start_time) or not parse_time(end_time):
+                    messagebox.showerror("错误", f"屏蔽时间段格式错误: {start_time} - {end_time}\n请使用 HH:MM 格式（如 09:00）", parent=window)
+                    return
+                block_periods.append({"start": start_time, "end": end_time})
+            
+            # 验证间隔
+            try:
+                interval = int(self._interval_entry.get().strip())
+                if interval <= 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("错误", "提醒间隔必须是大于0的整数", parent=window)
+                return
+            
+            # 获取工作日设置
+            selected_workdays = []
+            for i, var in enumerate(self._workdays_vars):
+                if var.get():
+                    selected_workdays.append(i + 1)  # 1=周一, 7=周日
+            
+            if not selected_workdays:
+                messagebox.showerror("错误", "至少需要选择一个工作日！", parent=window)
+                return
+            
+            # 验证下班时间
+            off_work_time = self._off_work_time_entry.get().strip()
+            if off_work_time and not parse_time(off_work_time):
+                messagebox.showerror("错误", f"下班时间格式错误: {off_work_time}\n请使用 HH:MM 格式（如 18:00）", parent=window)
+                return
+            
+            # 保存配置
+            auto_start = self._auto_start_var.get()
+            self.config = {
+                "work_periods": work_periods,
+                "block_periods": block_periods,
+                "interval_minutes": interval,
+                "auto_start": auto_start,
+                "workdays": selected_workdays,
+                "off_work_time": off_work_time if off_work_time else "18:00",
+                "off_work_reminder_enabled": self._off_work_reminder_var.get()
+            }
+            self.config_manager.save_config(self.config)
+            self._config_dirty.set()
+            self._wake.set()
+            
+            # 设置开机自启动
+            if AutoStartManager.set_auto_start(auto_start):
+                self._autostart_cached = auto_start
+            
+            # 隐藏配置窗口，下次打开时复用
+            window.withdraw()
+            
+            # 如果服务未运行，启动服务；如果已运行，配置会在下次循环时生效
+            if not self.running:
+                self.start_reminder_service()
+            else:
+                messagebox.showinfo("提示", "配置已保存，新的设置将在下次提醒时生效！")
+        
+        except Exception as e:
+            messagebox.showerror("错误", f"启动失败: {e}", parent=window)
+
+    def _build_clock_face(self):
+        """绘制不含倒计时文字的闹钟表盘"""
         img = Image.new("RGB", (64, 64), (255, 255, 255))
         draw = ImageDraw.Draw(img)
         
@@ -656,25 +794,23 @@ class LetMeGoApp:
         # 绘制中心点
         draw.ellipse([30, 30, 34, 34], fill=(0, 0, 0))
         
+        return img
+    
+    def create_tray_icon_image(self, text=""):
+        """创建托盘图标图像（闹钟图标）"""
+        img = self._base_clock_img.copy()
+        
         # 如果提供了文字，在右下角显示（用于倒计时）
         if text:
-            try:
-                from PIL import ImageFont
-                try:
-                    font_path = "C:/Windows/Fonts/arial.ttf"
-                    font = ImageFont.truetype(font_path, 12)
-                except:
-                    font = ImageFont.load_default()
-                
-                # 文字显示在右下角
-                text_width = len(text) * 7
-                x = 64 - text_width - 2
-                y = 64 - 16
-                # 绘制文字背景（半透明）
-                draw.rectangle([x-2, y-2, 62, 62], fill=(0, 0, 0))
-                draw.text((x, y), text, fill=(255, 255, 255), font=font)
-            except:
-                pass
+            draw = ImageDraw.Draw(img)
+            
+            # 文字显示在右下角
+            text_width = len(text) * 7
+            x = 64 - text_width - 2
+            y = 64 - 16
+            # 绘制文字背景（半透明）
+            draw.rectangle([x-2, y-2, 62, 62], fill=(0, 0, 0))
+            draw.text((x, y), text, fill=(255, 255, 255), font=_TRAY_FONT)
         
         return img
     
@@ -691,185 +827,251 @@ class LetMeGoApp:
             mins = remaining // 60
             secs = remaining % 60
             
+            # 倒计时按分钟显示（超过99分钟统一显示99+），显示状态不变时不重绘
+            icon_key = min(mins, 100)
+            if icon_key == self._last_icon_key:
+                return
+            
             if mins > 99:
                 text = "99+"
             else:
                 text = f"{mins:02d}"
             
-            self.icon.icon = self.create_tray_icon_image(text)
+            image = self._icon_cache.get(text)
+            if image is None:
+                image = self._icon_cache[text] = self.create_tray_icon_image(text)
+            self.icon.icon = image
+            self._last_icon_key = icon_key
         except Exception:
             pass
     
     def show_reminder_popup(self, message=None, title=None):
-        """显示提醒弹窗"""
-        def popup_thread():
-            root = tk.Tk()
-            root.withdraw()
-            root.attributes('-topmost', True)
-            root.update()
-            
-            msg = message if message else "该站起来走走了！\n\n已经坐了很长时间，起来活动一下吧！\n\n是否已完成活动？"
-            title_text = title if title else "⏰ 健康提醒"
+        """显示提醒弹窗（可在任意线程调用，弹窗由Tk事件循环显示）"""
+        self._tk_root.after(0, self._show_reminder_popup, message, title)
+    
+    def _show_reminder_popup(self, message, title):
+        """在Tk线程中显示提醒弹窗"""
+        msg = message if message else "该站起来走走了！\n\n已经坐了很长时间，起来活动一下吧！\n\n是否已完成活动？"
+        title_text = title if title else "⏰ 健康提醒"
+        
+        if message and "下班" in message:
+            # 下班提醒只需确认，不需要选择
+            messagebox.showinfo(title_text, msg, parent=self._tk_root)
+        else:
+            result = messagebox.askyesno(title_text, msg, icon="question", parent=self._tk_root)
             
-            if message and "下班" in message:
-                # 下班提醒只需确认，不需要选择
-                messagebox.showinfo(title_text, msg)
-                root.destroy()
+            if result:
+                self.last_reminder_mono = time.monotonic()
+                self._wake.set()
+    
+    def _compile_config(self):
+        """预解析当前配置中的时间字段，配置变更时调用一次，避免每次循环重复解析
+        
+        配置文件被手动改错（字段类型不对）时打印错误并改用默认配置，
+        而不是让提醒服务在每次循环中反复出错。
+        """
+        try:
+            self._apply_config(self.config)
+        except (ValueError, TypeError, AttributeError, KeyError) as e:
+            print(f"配置文件格式错误，使用默认配置: {e!r}")
+            self.config = self.config_manager.default_config.copy()
+            self._apply_config(self.config)
+    
+    def _apply_config(self, config):
+        """根据配置计算提醒服务使用的各项数据，字段类型错误时抛出异常"""
+        self._work_ranges = parse_periods(config.get("work_periods", []))
+        self._block_ranges = parse_periods(config.get("block_periods", []))
+        self._off_work_time = parse_time(config.get("off_work_time", "18:00"))
+        self._off_work_reminder_enabled = bool(config.get("off_work_reminder_enabled", True))
+        self._interval = int(config.get("interval_minutes", 60))
+        if self._interval <= 0:
+            raise ValueError(f"interval_minutes 必须大于0: {self._interval}")
+        self._workdays = frozenset(int(d) for d in config.get("workdays", [1, 2, 3, 4, 5]))
+        workday_mask = sum(1 << (d - 1) for d in self._workdays if 1 <= d <= 7)
+        # 星期 d（1-7）之后到下一个工作日的天数，下标为 d-1
+        self._next_workday_offset = tuple(
+            days_until_next_workday(workday_mask, weekday) for weekday in range(1, 8))
+        self._work_starts, self._work_ends = build_minute_index(self._work_ranges)
+        self._block_starts, self._block_ends = build_minute_index(self._block_ranges)
+        # 一天内所有可能改变提醒状态的分钟（时间段开始、结束以及午夜）
+        self._boundaries = sorted(set(
+            self._work_starts + self._block_starts
+            + self._work_ends + self._block_ends
+            + [24 * 60]
+        ))
+        # 配置变化后需要重新计算当天的时间点
+        self._boundaries_date = None
+    
+    def _rebuild_day(self, today):
+        """计算当天各时间边界和下班提醒对应的datetime，每天（或配置变更后）只计算一次"""
+        day_start = datetime.datetime.combine(today, datetime.time())
+        self._today_bounds = [day_start + datetime.timedelta(minutes=m) for m in self._boundaries]
+        # 下班提醒只在工作日发送
+        if self._off_work_reminder_enabled and self._off_work_time and today.isoweekday() in self._workdays:
+            off_work_dt = datetime.datetime.combine(today, self._off_work_time)
+            self._off_work_reminder_dt = off_work_dt - datetime.timedelta(minutes=10)
+        else:
+            self._off_work_reminder_dt = None
+        
+        # 提醒可能重新开始的时间点：工作时间段开始和屏蔽时间段结束（仅工作日）
+        # 与 minute_in_index 使用同一份分钟索引，屏蔽结束的那一刻即已不在屏蔽时间段内
+        day_events = []
+        if today.isoweekday() in self._workdays:
+            day_events = sorted(set(
+                day_start + datetime.timedelta(minutes=m)
+                for m in self._work_starts + self._block_ends
+            ))
+        self._day_events = day_events
+        
+        # 今天的时间点都已过去时，使用下一个工作日最早的开始时间
+        # （时间段已按开始时间排序，第一个即最早的开始时间）
+        days_ahead = self._next_workday_offset[today.isoweekday() - 1]
+        if days_ahead and self._work_ranges:
+            next_workday = today + datetime.timedelta(days=days_ahead)
+            self._next_workday_start = datetime.datetime.combine(next_workday, self._work_ranges[0][0])
+        else:
+            self._next_workday_start = None
+        self._boundaries_date = today
+    
+    def _compute_next_event(self, now, now_min):
+        """计算下一个需要唤醒提醒服务的时间点
+        
+        取时间段边界、托盘倒计时的下一次变化（同时覆盖下次提醒时间）
+        和下班提醒时间中最早的一个。
+        """
+        today = now.date()
+        
+        # _boundaries 总是包含午夜，因此一定能找到下一个边界
+        idx = bisect.bisect_right(self._boundaries, now_min)
+        next_event = self._today_bounds[idx]
+        
+        if self.next_reminder and self.next_reminder > now:
+            # 剩余秒数跨过整分钟后显示才会变化，稍微延后一点避免在边界上多唤醒一次
+            remaining = (self.next_reminder - now).total_seconds()
+            if remaining >= 100 * 60:
+                # 显示"99+"期间文字不会变化，直接等到剩余时间降到99分钟
+                tick = self.next_reminder - datetime.timedelta(minutes=100) + datetime.timedelta(seconds=0.05)
             else:
-                result = messagebox.askyesno(title_text, msg, icon="question")
-                root.destroy()
-                
-                if result:
-                    self.last_reminder_time = datetime.datetime.now()
+                tick = now + datetime.timedelta(seconds=remaining % 60 + 0.05)
+            next_event = min(next_event, tick)
+        
+        reminder_dt = self._off_work_reminder_dt
+        if reminder_dt and self.last_off_work_reminder_date != today and reminder_dt > now:
+            next_event = min(next_event, reminder_dt)
         
-        threading.Thread(target=popup_thread, daemon=True).start()
+        return next_event
+    
+    def _first_tick(self, now, mono_now, interval):
+        """首次进入工作时间段：设置初始时间，不立即提醒，之后切换为 _normal_tick"""
+        self.last_reminder_mono = mono_now
+        self._tick_fn = self._normal_tick
+        # 计算下次提醒时间
+        self.next_reminder = now + datetime.timedelta(minutes=interval)
+    
+    def _normal_tick(self, now, mono_now, interval):
+        """工作时间段内的常规检查：到达间隔则提醒，否则更新倒计时"""
+        if (self.last_reminder_mono is None or
+                mono_now >= self.last_reminder_mono + interval * 60):
+            self.show_reminder_popup()
+            self.last_reminder_mono = mono_now
+            
+            # 计算下次提醒时间
+            self.next_reminder = now + datetime.timedelta(minutes=interval)
+        else:
+            # 计算下次提醒时间（仅用于托盘显示）
+            due = self.last_reminder_mono + interval * 60
+            self.next_reminder = now + datetime.timedelta(seconds=due - mono_now)
     
     def reminder_service(self):
         """提醒服务主循环"""
+        retry_delay = 1  # 出错后的重试等待秒数
         while self.running:
             try:
-                # 每次循环重新加载配置，以支持运行时配置更新
-                self.config = self.config_manager.load_config()
+                # 仅在配置被保存后重新加载
+                if self._config_dirty.is_set():
+                    self.config = self.config_manager.load_config()
+                    self._compile_config()
+                    self._config_dirty.clear()
                 
                 now = datetime.datetime.now()
-                current_time = now.time()
+                now_min = now.hour * 60 + now.minute
                 today = now.date()
                 weekday = now.weekday() + 1  # 转换为1-7 (1=周一, 7=周日)
                 
-                # 获取配置
-                work_periods = self.config.get("work_periods", [])
-                block_periods = self.config.get("block_periods", [])
-                interval = self.config.get("interval_minutes", 60)
-                workdays = self.config.get("workdays", [1, 2, 3, 4, 5])
-                off_work_time_str = self.config.get("off_work_time", "18:00")
-                off_work_reminder_enabled = self.config.get("off_work_reminder_enabled", True)
+                # 跨天（或配置变更）时重新计算当天的时间点
+                if today != self._boundaries_date:
+                    self._rebuild_day(today)
+                    # 每天重置下班提醒日期（跨天时）
+                    if self.last_off_work_reminder_date and self.last_off_work_reminder_date < today:
+                        self.last_off_work_reminder_date = None
+                
+                # 配置快照（仅在配置变更时由 _compile_config 更新）
+                interval = self._interval
+                off_work_reminder_dt = self._off_work_reminder_dt
                 
-                if not work_periods:
-                    time.sleep(60)
+                if not self._work_ranges:
+                    self._wake.wait(timeout=60)
+                    self._wake.clear()
                     continue
                 
                 # 检查今天是否是工作日
-                is_workday = weekday in workdays
+                is_workday = weekday in self._workdays
                 
-                # 下班提醒检查（仅在工作日）
-                if is_workday and off_work_reminder_enabled and off_work_time_str:
-                    off_work_time = parse_time(off_work_time_str)
-                    if off_work_time:
-                        # 计算下班前10分钟的时间
-                        off_work_dt = datetime.datetime.combine(today, off_work_time)
-                        reminder_dt = off_work_dt - datetime.timedelta(minutes=10)
-                        
-                        # 检查是否到了下班提醒时间（在前后30秒内）
-                        time_diff = abs((now - reminder_dt).total_seconds())
-                        if time_diff <= 30:
-                            # 检查今天是否已经提醒过
-                            if self.last_off_work_reminder_date != today:
-                                self.show_reminder_popup(
-                                    "🎉 马上下班咯！\n\n还有10分钟就下班了，准备一下下班的事情吧！",
-                                    "下班提醒"
-                                )
-                                self.last_off_work_reminder_date = today
+                # 下班提醒检查（仅在工作日，未启用下班提醒时 off_work_reminder_dt 为 None）
+                if is_workday and off_work_reminder_dt:
+                    # 检查是否到了下班提醒时间（在前后30秒内）
+                    time_diff = abs((now - off_work_reminder_dt).total_seconds())
+                    if time_diff <= 30:
+                        # 检查今天是否已经提醒过
+                        if self.last_off_work_reminder_date != today:
+                            self.show_reminder_popup(
+                                "🎉 马上下班咯！\n\n还有10分钟就下班了，准备一下下班的事情吧！",
+                                "下班提醒"
+                            )
+                            self.last_off_work_reminder_date = today
                 
                 # 检查是否在任意一个工作时间段内（仅在工作日）
-                in_work_period = False
-                if is_workday:
-                    for period in work_periods:
-                        start_time = parse_time(period.get("start"))
-                        end_time = parse_time(period.get("end"))
-                        if start_time and end_time and time_in_range(start_time, end_time, current_time):
-                            in_work_period = True
-                            break
+                in_work_period = is_workday and minute_in_index(self._work_starts, self._work_ends, now_min)
                 
                 # 检查是否在任意一个屏蔽时间段内
-                in_block_period = False
-                for period in block_periods:
-                    block_start = parse_time(period.get("start"))
-                    block_end = parse_time(period.get("end"))
-                    if block_start and block_end and time_in_range(block_start, block_end, current_time):
-                        in_block_period = True
-                        break
+                in_block_period = bool(self._block_starts) and minute_in_index(
+                    self._block_starts, self._block_ends, now_min)
                 
                 if in_work_period and not in_block_period:
-                    # 首次启动时，设置初始时间，不立即提醒
-                    if self.is_first_start:
-                        self.last_reminder_time = now
-                        self.is_first_start = False
-                        # 计算下次提醒时间
-                        self.next_reminder = now + datetime.timedelta(minutes=interval)
                     # 在工作时间段内且不在屏蔽时间段内，检查是否需要提醒
-                    elif (self.last_reminder_time is None or 
-                        (now - self.last_reminder_time).total_seconds() >= interval * 60):
-                        self.show_reminder_popup()
-                        self.last_reminder_time = now
-                        
-                        # 计算下次提醒时间
-                        self.next_reminder = now + datetime.timedelta(minutes=interval)
-                    else:
-                        # 计算下次提醒时间
-                        elapsed = (now - self.last_reminder_time).total_seconds() / 60
-                        remaining = interval - elapsed
-                        self.next_reminder = now + datetime.timedelta(minutes=remaining)
+                    self._tick_fn(now, time.monotonic(), interval)
                 else:
-                    # 不在工作时间段内或在屏蔽时间段内，计算下次提醒时间
-                    next_times = []
-                    
-                    # 计算所有工作时间段的开始时间（仅考虑工作日）
-                    if is_workday:
-                        for period in work_periods:
-                            start_time = parse_time(period.get("start"))
-                            if start_time:
-                                start_dt = datetime.datetime.combine(today, start_time)
-                                if start_dt <= now:
-                                    start_dt += datetime.timedelta(days=1)
-                                next_times.append(start_dt)
-                    
-                    # 如果是周末，计算下一个工作日的开始时间
-                    if not is_workday and workdays:
-                        days_ahead = 1
-                        while (weekday + days_ahead - 1) % 7 + 1 not in workdays:
-                            days_ahead += 1
-                            if days_ahead > 7:
-                                break
-                        if days_ahead <= 7 and work_periods:
-                            first_period = work_periods[0]
-                            start_time = parse_time(first_period.get("start"))
-                            if start_time:
-                                next_workday = today + datetime.timedelta(days=days_ahead)
-                                next_times.append(datetime.datetime.combine(next_workday, start_time))
-                    
-                    # 计算所有屏蔽时间段的结束时间
-                    for period in block_periods:
-                        block_end = parse_time(period.get("end"))
-                        if block_end:
-                            block_end_dt = datetime.datetime.combine(today, block_end)
-                            if block_end_dt <= now:
-                                block_end_dt += datetime.timedelta(days=1)
-                            next_times.append(block_end_dt)
-                    
-                    if next_times:
-                        self.next_reminder = min(next_times)
+                    # 不在工作时间段内或在屏蔽时间段内，下次提醒为今天之后最近的一个
+                    # 工作时间段开始或屏蔽结束；今天已没有时，取下一个工作日的开始时间
+                    idx = bisect.bisect_right(self._day_events, now)
+                    if idx < len(self._day_events):
+                        self.next_reminder = self._day_events[idx]
+                    elif self._next_workday_start:
+                        self.next_reminder = self._next_workday_start
                     else:
                         # 如果没有时间段，设置一个默认的
                         self.next_reminder = now + datetime.timedelta(hours=1)
                 
-                # 每天重置下班提醒日期（跨天时）
-                if self.last_off_work_reminder_date and self.last_off_work_reminder_date < today:
-                    self.last_off_work_reminder_date = None
+                self.update_tray_icon()
                 
-                # 每秒更新一次图标
-                for _ in range(60):
-                    if not self.running:
-                        return
-                    self.update_tray_icon()
-                    time.sleep(1)
-                    
-            except Exception as e:
-                print(f"提醒服务错误: {e}")
-                time.sleep(60)
+                # 休眠到下一个事件，配置变更或提醒确认时会被提前唤醒
+                next_ts = self._compute_next_event(now, now_min)
+                wait = max(0.5, (next_ts - datetime.datetime.now()).total_seconds())
+                self._wake.wait(timeout=wait)
+                self._wake.clear()
+                
+                retry_delay = 1
+                
+            except (OSError, ValueError) as e:
+                # 偶发的系统或时间计算错误：等待后重试，连续出错时逐步延长等待（最长60秒）
+                print(f"提醒服务错误: {e!r}，{retry_delay}秒后重试")
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 60)
     
     def on_tray_show_config(self, icon, item):
         """托盘菜单：显示配置"""
-        threading.Thread(target=self.show_config_window, daemon=True).start()
+        # 配置窗口属于主线程的Tk事件循环，交给它来显示
+        self._tk_root.after(0, self.show_config_window)
     
     def on_tray_manual_reminder(self, icon, item):
         """托盘菜单：手动提醒"""
@@ -879,17 +1081,21 @@ class LetMeGoApp:
         """托盘菜单：退出"""
         self.running = False
         self.tray_running = False
+        self._wake.set()  # 让提醒服务立即结束等待并退出
         if self.icon:
             self.icon.stop()
+        # 结束主线程的Tk事件循环，程序随之退出
+        self._tk_root.after(0, self._tk_root.quit)
     
     def tray_service(self):
         """系统托盘服务"""
         image = self.create_tray_icon_image()
+        self._last_icon_key = None
         menu = pystray.Menu(
-            pystray.MenuItem("⚙️ 设置", self.on_tray_show_config),
-            pystray.MenuItem("🔔 立即提醒", self.on_tray_manual_reminder),
+            pystray.MenuItem("⚙️ 设置", self._cb_show),
+            pystray.MenuItem("🔔 立即提醒", self._cb_remind),
             pystray.Menu.SEPARATOR,
-            pystray.MenuItem("❌ 退出", self.on_tray_exit)
+            pystray.MenuItem("❌ 退出", self._cb_exit)
         )
         
         self.icon = pystray.Icon(
@@ -898,12 +1104,16 @@ class LetMeGoApp:
             "Let Me Go - 健康提醒助手\n右键可进行设置",
             menu
         )
+        # 图标创建后唤醒提醒服务，立即绘制倒计时
+        self._wake.set()
         
         self.icon.run()
     
     def start_reminder_service(self):
         """启动提醒服务"""
         self.running = True
+        # 首次进入工作时间段时只开始计时，不立即提醒
+        self._tick_fn = self._first_tick
         
         # 启动提醒线程
         reminder_thread = threading.Thread(target=self.reminder_service, daemon=True)
@@ -912,12 +1122,6 @@ class LetMeGoApp:
         # 启动托盘线程
         tray_thread = threading.Thread(target=self.tray_service, daemon=False)
         tray_thread.start()
-        
-        # 等待托盘退出
-        tray_thread.join()
-        
-        # 托盘退出后停止提醒服务
-        self.running = False
 
 
 # =============== 主程序入口 ===============